@@ -1,11 +1,17 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import json
+import hashlib
+from pathlib import Path
+import orjson
 import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
 from io import BytesIO
 import xlsxwriter
 
@@ -16,8 +22,8 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS
-st.markdown("""
+# Custom CSS, built once at import time
+_PAGE_CSS = """
 <style>
     .header-container {
         background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
@@ -75,15 +81,20 @@ st.markdown("""
         border-left: 4px solid #4dabf7;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-def render_kpi(title, value, subtitle="", color_class=""):
-    """Render KPI card."""
-    return f'<div class="kpi-box {color_class}"><div class="kpi-title">{title}</div><div class="kpi-value">{value}</div><div class="kpi-sub">{subtitle}</div></div>'
+st.markdown(_PAGE_CSS, unsafe_allow_html=True)
 
-def render_leader_card(title, name, value, subtitle, icon="🏆"):
-    """Render a fancy leader card."""
-    return f"""
+# HTML baked once at import time; render calls just substitute values
+_KPI_TEMPLATE = (
+    '<div class="kpi-box {color_class}">'
+    '<div class="kpi-title">{title}</div>'
+    '<div class="kpi-value">{value}</div>'
+    '<div class="kpi-sub">{subtitle}</div>'
+    '</div>'
+)
+
+_LEADER_CARD_TEMPLATE = """
     <div style="
         background: linear-gradient(135deg, #FFD700 0%, #FFA500 100%);
         border-radius: 15px;
@@ -107,25 +118,143 @@ def render_leader_card(title, name, value, subtitle, icon="🏆"):
     </div>
     """
 
+def render_kpi(title, value, subtitle="", color_class=""):
+    """Render KPI card."""
+    return _KPI_TEMPLATE.format(color_class=color_class, title=title,
+                                value=value, subtitle=subtitle)
+
+def render_leader_card(title, name, value, subtitle, icon="🏆"):
+    """Render a fancy leader card."""
+    return _LEADER_CARD_TEMPLATE.format(title=title, name=name, value=value,
+                                        subtitle=subtitle, icon=icon)
+
 def render_kpi_row(kpis):
     """Render row of KPI cards."""
     return f'<div class="kpi-container">{"".join(kpis)}</div>'
 
+# Shared session so repeat fetches reuse the TCP+TLS connection instead of
+# paying a fresh handshake, with gzip-compressed responses and retries
+_session = requests.Session()
+_session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+_session.mount('https://', HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
+
+@st.cache_data(ttl=300, show_spinner=False)
+def _fetch_sheets_frame(api_url):
+    """Fetch and parse the sheets payload; raises on any failure.
+
+    Only successful frames land in the cache - st.cache_data does not
+    memoize raised exceptions, so a transient failure here is retried on
+    the next click instead of being replayed for the whole TTL.
+    """
+    response = _session.get(f"{api_url}?action=getData", timeout=30)
+    response.raise_for_status()
+    # orjson parses the raw bytes in C, several times faster than
+    # response.json() on large payloads
+    data = orjson.loads(response.content)
+
+    if isinstance(data, dict) and 'data' in data:
+        return pd.DataFrame(data['data'])
+    elif isinstance(data, dict) and 'columns' in data and 'rows' in data:
+        # Columnar payload: build each column directly rather than
+        # hashing dict keys for every record
+        return pd.DataFrame(dict(zip(data['columns'], zip(*data['rows']))))
+    else:
+        raise ValueError(data.get('error', 'Unknown error')
+                         if isinstance(data, dict) else 'Unknown error')
+
 def fetch_data_from_sheets(api_url):
     """Fetch data from Google Apps Script API."""
     try:
-        response = requests.get(f"{api_url}?action=getData", timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        
-        if isinstance(data, dict) and 'data' in data:
-            return pd.DataFrame(data['data']), None
-        else:
-            return None, data.get('error', 'Unknown error')
-    
+        return _fetch_sheets_frame(api_url), None
     except Exception as e:
         return None, str(e)
 
+# Columns that must stay text even when every value looks numeric.
+# Pinning them at parse time matters: a post-hoc astype runs after the
+# parser has already inferred digit-only contact numbers as integers,
+# which drops leading zeros. Names a given export lacks are ignored.
+CSV_COLUMN_TYPES = {
+    'contact_number': pa.string(),
+    'mail_id': pa.string(),
+}
+
+_CSV_CONVERT_OPTIONS = pa_csv.ConvertOptions(
+    column_types=CSV_COLUMN_TYPES,
+    strings_can_be_null=True,
+)
+
+# On-disk cache of normalized uploads; st.cache_data only lives for the
+# server process, so a restart or a fresh session re-parses the CSV
+# unless the Parquet copy is there to read back instead. Kept out of
+# version control via .gitignore and capped like _perf_memo so distinct
+# uploads don't accumulate forever.
+_PARQUET_CACHE_DIR = Path('.cache')
+_PARQUET_CACHE_LIMIT = 8
+
+def _prune_parquet_cache():
+    files = sorted(_PARQUET_CACHE_DIR.glob('*.parquet'),
+                   key=lambda p: p.stat().st_mtime)
+    for stale in files[:-_PARQUET_CACHE_LIMIT]:
+        try:
+            stale.unlink()
+        except OSError:
+            pass
+
+@st.cache_data(show_spinner=False)
+def load_and_normalize(file_bytes):
+    """Parse an uploaded CSV export and normalize it.
+
+    Keyed on the raw file bytes, so reruns after the initial load skip
+    both the parse and the derived-column work. The normalized frame is
+    also persisted to Parquet keyed on the same bytes for cross-session
+    reuse.
+    """
+    cache_path = _PARQUET_CACHE_DIR / f'{hashlib.sha1(file_bytes).hexdigest()}.parquet'
+    if cache_path.exists():
+        try:
+            df = pd.read_parquet(cache_path)
+        except Exception:
+            # A corrupt entry (e.g. a process killed mid-write before the
+            # rename below existed) would otherwise brick every reload of
+            # this upload; drop it and re-parse
+            try:
+                cache_path.unlink()
+            except OSError:
+                pass
+        else:
+            try:
+                # Refresh mtime so pruning evicts least-recently-used entries
+                cache_path.touch()
+            except OSError:
+                pass
+            return df
+
+    # pyarrow parses in multithreaded C++ and lands strings in Arrow
+    # buffers instead of Python object arrays; the categorical and
+    # numeric casts happen in normalize_dataframe after renaming
+    table = pa_csv.read_csv(pa.BufferReader(file_bytes),
+                            convert_options=_CSV_CONVERT_OPTIONS)
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+    df = normalize_dataframe(df)
+
+    try:
+        _PARQUET_CACHE_DIR.mkdir(exist_ok=True)
+        # Write to a temp name and rename into place so the keyed path
+        # only ever holds a complete file
+        tmp_path = cache_path.with_suffix('.tmp')
+        df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+        tmp_path.replace(cache_path)
+        _prune_parquet_cache()
+    except OSError:
+        # Read-only deployments just skip the disk cache
+        pass
+    return df
+
+@st.cache_data(show_spinner=False)
 def normalize_dataframe(df):
     """Normalize column names and data."""
     if df.empty:
@@ -150,42 +279,66 @@ def normalize_dataframe(df):
     }
     
     df = df.rename(columns=column_mapping)
-    
-    # Normalize Status
+
+    # Parse date columns once; downstream checks become plain .notna()
+    # bitmap reads instead of re-stringifying the column each time
+    for col in ('Joining_Date', 'Started_Date', 'Completed_Date'):
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    # Normalize Status with Arrow's string kernels - the lowercasing and
+    # substring matches run as SIMD loops in C++ rather than pandas
+    # object-dtype string ops
     if 'Status' in df.columns:
-        def clean_status(x):
-            s = str(x).lower().strip()
-            if 'started' in s and 'not' not in s:
-                return 'Started'
-            elif 'yes' in s:
-                return 'Started'
-            # Check for dates in Started_Date if status is ambiguous? 
-            # For now, strict 'not started' check
-            return 'Not Started'
-
-        df['Status_Clean'] = df['Status'].apply(clean_status)
+        lowered = pc.utf8_lower(pa.array(df['Status'].astype(str), type=pa.string()))
+        # 'started' without 'not', or an explicit 'yes', counts as Started.
+        # Anything ambiguous falls back to 'Not Started'.
+        started = pc.and_(
+            pc.match_substring(lowered, 'started'),
+            pc.invert(pc.match_substring(lowered, 'not'))
+        )
+        started_mask = pc.or_(started, pc.match_substring(lowered, 'yes'))
+        df['Status_Clean'] = np.where(
+            started_mask.to_numpy(zero_copy_only=False),
+            'Started', 'Not Started'
+        )
     
     # Cross-verify with Started_Date if available
     if 'Started_Date' in df.columns and 'Status_Clean' in df.columns:
         # If started date is present, force status to Started
-        df.loc[df['Started_Date'].astype(str).str.strip().str.len() > 4, 'Status_Clean'] = 'Started'
-    
+        df.loc[df['Started_Date'].notna(), 'Status_Clean'] = 'Started'
+
     # Add completion status
     if 'Completed_Date' in df.columns:
-        # More robust completion check
-        df['Is_Completed'] = df['Completed_Date'].apply(
-            lambda x: bool(x) and str(x).strip() not in ['', 'nan', 'None', 'NaT']
-        )
-        df['Completion_Status'] = df['Is_Completed'].apply(
-            lambda x: 'Completed' if x else 'In Progress'
+        df['Is_Completed'] = df['Completed_Date'].notna()
+        # The bool column is already the category code, so build the
+        # categorical directly - no string array materialized at all
+        df['Completion_Status'] = pd.Categorical.from_codes(
+            df['Is_Completed'].to_numpy().astype(np.int8),
+            categories=['In Progress', 'Completed']
         )
     else:
         # If no Completed_Date column, mark all as In Progress
         df['Is_Completed'] = False
         df['Completion_Status'] = 'In Progress'
-    
+
+    # Package hours arrive as strings/objects; coerce to the smallest
+    # numeric dtype that fits
+    if 'Package_Hours' in df.columns:
+        df['Package_Hours'] = pd.to_numeric(df['Package_Hours'], errors='coerce',
+                                            downcast='integer')
+
+    # Low-cardinality string columns repeat the same few values on every
+    # row; category dtype stores one small int code per row instead of a
+    # Python string, shrinking memory and speeding up groupby/comparisons
+    for col in ('Tutor', 'Team', 'Course', 'Status', 'Status_Clean',
+                'Month', 'New_Old', 'Completion_Status'):
+        if col in df.columns:
+            df[col] = df[col].astype('category')
+
     return df
 
+@st.cache_data(show_spinner=False)
 def calculate_kpis(df):
     """Calculate KPIs."""
     if df.empty:
@@ -193,22 +346,33 @@ def calculate_kpis(df):
     
     total_students = len(df)
     
-    # Status breakdown
-    started = len(df[df['Status_Clean'] == 'Started']) if 'Status_Clean' in df.columns else 0
+    # Status breakdown - sum the boolean mask directly instead of
+    # materializing a filtered copy just to take its length
+    started = int((df['Status_Clean'] == 'Started').sum()) if 'Status_Clean' in df.columns else 0
     not_started = total_students - started
-    
+
     # Completion
-    completed = df['Is_Completed'].sum() if 'Is_Completed' in df.columns else 0
+    completed = int(df['Is_Completed'].sum()) if 'Is_Completed' in df.columns else 0
     in_progress = started - completed
     
     # Rates
     start_rate = round((started / total_students * 100), 1) if total_students > 0 else 0
     completion_rate = round((completed / total_students * 100), 1) if total_students > 0 else 0
     
-    # Top performers
-    top_tutor = df['Tutor'].value_counts().index[0] if 'Tutor' in df.columns and not df['Tutor'].empty else 'N/A'
-    top_team = df['Team'].value_counts().index[0] if 'Team' in df.columns and not df['Team'].empty else 'N/A'
-    top_course = df['Course'].value_counts().index[0] if 'Course' in df.columns and not df['Course'].empty else 'N/A'
+    # Top performers - one bincount over the category codes beats
+    # value_counts, which builds and sorts a full frequency Series
+    def top_value(col):
+        if col not in df.columns or not df[col].notna().any():
+            return 'N/A'
+        s = df[col]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            codes = s.cat.codes.to_numpy()
+            return s.cat.categories[np.bincount(codes[codes >= 0]).argmax()]
+        return s.value_counts(sort=False).idxmax()
+
+    top_tutor = top_value('Tutor')
+    top_team = top_value('Team')
+    top_course = top_value('Course')
     
     return {
         'total_students': total_students,
@@ -223,77 +387,162 @@ def calculate_kpis(df):
         'top_course': str(top_course)[:20]
     }
 
+def group_status_counts(df, key):
+    """Grouped student/started/completed counts in one pass over ``key``.
+
+    Runs the reductions directly over the category codes with np.bincount
+    instead of three separate pandas groupbys - one C-level sweep per
+    counter, no per-group Python dispatch.
+    """
+    col = df[key]
+    if not isinstance(col.dtype, pd.CategoricalDtype):
+        col = col.astype('category')
+    codes = col.cat.codes.to_numpy()
+    n_groups = len(col.cat.categories)
+    valid = codes >= 0
+
+    started = (df['Status_Clean'] == 'Started').to_numpy() & valid
+    completed = df['Is_Completed'].to_numpy(dtype=bool) & valid
+    in_progress = (df['Completion_Status'] == 'In Progress').to_numpy() & valid
+
+    total = np.bincount(codes[valid], minlength=n_groups)
+    stats = pd.DataFrame({
+        key: col.cat.categories,
+        'Total_Students': total,
+        'Started': np.bincount(codes[started], minlength=n_groups),
+        'Completed': np.bincount(codes[completed], minlength=n_groups),
+        'In_Progress': np.bincount(codes[in_progress], minlength=n_groups)
+    })
+    # Keep only observed groups, matching groupby(observed=True)
+    return stats[total > 0].reset_index(drop=True)
+
+# Identity-keyed memo sitting above st.cache_data: hashing a large
+# DataFrame for the cache lookup is itself a full pass, so calls that
+# reuse the exact same object within a session skip even that. Each
+# entry keeps a strong reference to the keyed frame - otherwise CPython
+# could recycle a collected frame's id for a different frame of the
+# same length and the memo would silently serve the wrong table.
+_perf_memo = {}
+
+def _memoize_by_identity(name, df, builder):
+    key = (name, id(df), len(df))
+    entry = _perf_memo.get(key)
+    if entry is not None and entry[0] is df:
+        return entry[1]
+    result = builder(df)
+    if len(_perf_memo) >= 8:
+        _perf_memo.pop(next(iter(_perf_memo)))
+    _perf_memo[key] = (df, result)
+    return result
+
+def rate_percent(numer, denom):
+    """Percentage rate with zero denominators left at 0.
+
+    np.divide with a where= mask skips the zero lanes entirely, unlike
+    np.where(denom > 0, numer / denom, 0) which still divides every row
+    and allocates the discarded result.
+    """
+    denom = denom.to_numpy(dtype=np.float64)
+    rates = np.zeros(len(denom))
+    np.divide(numer.to_numpy(dtype=np.float64), denom, out=rates, where=denom > 0)
+    return np.round(rates * 100, 1)
+
 def create_tutor_performance(df):
     """Create tutor performance metrics."""
+    return _memoize_by_identity('tutor', df, _tutor_performance)
+
+@st.cache_data(show_spinner=False)
+def _tutor_performance(df):
     if df.empty or 'Tutor' not in df.columns:
         return pd.DataFrame()
-    
-    tutor_stats = df.groupby('Tutor').agg(
-        Total_Students=('Student_Name', 'count'),
-        Started=('Status_Clean', lambda x: (x == 'Started').sum()),
-        Completed=('Is_Completed', 'sum'),
-        In_Progress=('Completion_Status', lambda x: (x == 'In Progress').sum())
-    ).reset_index()
-    
-    tutor_stats['Start_Rate_%'] = np.where(
-        tutor_stats['Total_Students'] > 0,
-        (tutor_stats['Started'] / tutor_stats['Total_Students'] * 100).round(1),
-        0
-    )
-    
-    tutor_stats['Completion_Rate_%'] = np.where(
-        tutor_stats['Started'] > 0,
-        (tutor_stats['Completed'] / tutor_stats['Started'] * 100).round(1),
-        0
-    )
+
+    tutor_stats = group_status_counts(df, 'Tutor')
+
+    tutor_stats['Start_Rate_%'] = rate_percent(
+        tutor_stats['Started'], tutor_stats['Total_Students'])
+    tutor_stats['Completion_Rate_%'] = rate_percent(
+        tutor_stats['Completed'], tutor_stats['Started'])
     
     return tutor_stats.sort_values('Total_Students', ascending=False)
 
 def create_team_performance(df):
     """Create team performance metrics."""
+    return _memoize_by_identity('team', df, _team_performance)
+
+@st.cache_data(show_spinner=False)
+def _team_performance(df):
     if df.empty or 'Team' not in df.columns:
         return pd.DataFrame()
     
-    team_stats = df.groupby('Team').agg(
-        Total_Students=('Student_Name', 'count'),
-        Started=('Status_Clean', lambda x: (x == 'Started').sum()),
-        Completed=('Is_Completed', 'sum')
-    ).reset_index()
-    
-    team_stats['Completion_Rate_%'] = np.where(
-        team_stats['Started'] > 0,
-        (team_stats['Completed'] / team_stats['Started'] * 100).round(1),
-        0
-    )
+    team_stats = group_status_counts(df, 'Team').drop(columns='In_Progress')
+
+    team_stats['Completion_Rate_%'] = rate_percent(
+        team_stats['Completed'], team_stats['Started'])
     
     return team_stats.sort_values('Total_Students', ascending=False)
 
 def create_course_analysis(df):
     """Create course-wise analysis."""
+    return _memoize_by_identity('course', df, _course_analysis)
+
+@st.cache_data(show_spinner=False)
+def _course_analysis(df):
     if df.empty or 'Course' not in df.columns:
         return pd.DataFrame()
     
-    course_stats = df.groupby('Course').agg(
-        Total_Students=('Student_Name', 'count'),
-        Started=('Status_Clean', lambda x: (x == 'Started').sum()),
-        Completed=('Is_Completed', lambda x: x.astype(int).sum())
-    ).reset_index()
-    
-    course_stats['Completion_Rate_%'] = np.where(
-        course_stats['Started'] > 0,
-        (course_stats['Completed'] / course_stats['Started'] * 100).round(1),
-        0
-    )
+    course_stats = group_status_counts(df, 'Course').drop(columns='In_Progress')
+
+    course_stats['Completion_Rate_%'] = rate_percent(
+        course_stats['Completed'], course_stats['Started'])
     
     return course_stats.sort_values('Total_Students', ascending=False)
 
-def create_excel_report(df, kpis, tutor_perf, team_perf, course_analysis):
+@st.cache_data(show_spinner=False)
+def create_csv_bytes(df):
+    """Serialize DataFrame to CSV bytes."""
+    # pyarrow streams straight to a buffer in C++ instead of building one
+    # big Python string and encoding it afterwards
+    buf = pa.BufferOutputStream()
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+    return buf.getvalue().to_pybytes()
+
+def write_report_sheet(workbook, sheet_name, frame, header_format):
+    """Write a DataFrame to a new worksheet, row by row."""
+    # constant_memory flushes each finished row, so cells must be written
+    # strictly in row order - pandas' to_excel writes column-major and
+    # cannot be used here
+    worksheet = workbook.add_worksheet(sheet_name)
+    # Size each column once up front from the header and a sample of
+    # values; constant_memory cannot revisit cells to autofit later
+    for col_num, name in enumerate(frame.columns):
+        sample = frame.iloc[:100, col_num].astype(str)
+        width = max(len(str(name)), sample.str.len().max() if len(sample) else 0)
+        worksheet.set_column(col_num, col_num, min(width + 2, 40))
+    for col_num, value in enumerate(frame.columns):
+        worksheet.write(0, col_num, value, header_format)
+    for row_num, row in enumerate(frame.itertuples(index=False, name=None), start=1):
+        for col_num, value in enumerate(row):
+            if pd.isna(value):
+                continue
+            if isinstance(value, np.generic):
+                value = value.item()
+            worksheet.write(row_num, col_num, value)
+
+@st.cache_data(show_spinner=False)
+def create_excel_report(df, kpis, tutor_perf, team_perf, course_analysis, include_raw=False):
     """Create Excel report."""
     output = BytesIO()
-    
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        workbook = writer.book
-        
+
+    # constant_memory streams each row to disk as it is written instead of
+    # holding the whole workbook in memory, so peak usage stays flat no
+    # matter how large the raw sheet is
+    with xlsxwriter.Workbook(output, {
+        'constant_memory': True,
+        'default_date_format': 'yyyy-mm-dd',
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    }) as workbook:
+
         header_format = workbook.add_format({
             'bold': True,
             'font_size': 12,
@@ -326,30 +575,95 @@ def create_excel_report(df, kpis, tutor_perf, team_perf, course_analysis):
         }
         
         summary_df = pd.DataFrame(summary_data)
-        summary_df.to_excel(writer, sheet_name='Executive Summary', index=False)
-        
-        worksheet = writer.sheets['Executive Summary']
-        for col_num, value in enumerate(summary_df.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-        
-        # Raw Data
-        if not df.empty:
-            df.to_excel(writer, sheet_name='Raw Data', index=False)
-        
+        write_report_sheet(workbook, 'Executive Summary', summary_df, header_format)
+
+        # Raw Data (optional - the largest sheet by far, skip unless asked)
+        if include_raw and not df.empty:
+            write_report_sheet(workbook, 'Raw Data', df, header_format)
+
         # Tutor Performance
         if not tutor_perf.empty:
-            tutor_perf.to_excel(writer, sheet_name='Tutor Performance', index=False)
-        
+            write_report_sheet(workbook, 'Tutor Performance', tutor_perf, header_format)
+
         # Team Performance
         if not team_perf.empty:
-            team_perf.to_excel(writer, sheet_name='Team Performance', index=False)
-        
+            write_report_sheet(workbook, 'Team Performance', team_perf, header_format)
+
         # Course Analysis
         if not course_analysis.empty:
-            course_analysis.to_excel(writer, sheet_name='Course Analysis', index=False)
-    
+            write_report_sheet(workbook, 'Course Analysis', course_analysis, header_format)
+
     return output.getvalue()
 
+@st.cache_data(show_spinner=False)
+def value_count_frame(values, label):
+    """Two-column count table for a status-style column, memoized."""
+    counts = values.value_counts().reset_index()
+    counts.columns = [label, 'Count']
+    return counts
+
+# Figure builders are cached on the (small, pre-aggregated) frames they
+# receive and return plain dicts, so tab switches replay a stored figure
+# instead of rebuilding Plotly traces on every rerun
+@st.cache_data(show_spinner=False)
+def build_status_pie(status_counts):
+    fig = px.pie(status_counts, values='Count', names='Status',
+                 title='Student Status Distribution', hole=0.3)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_completion_bar(comp_counts):
+    fig = px.bar(comp_counts, x='Status', y='Count',
+                 title='Completion Status', color='Count')
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_tutor_bar(top_tutors):
+    fig = px.bar(top_tutors, x='Tutor', y='Total_Students',
+                 title='Top 10 Tutors by Student Count',
+                 color='Completion_Rate_%', color_continuous_scale='Greens')
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_team_bar(team_perf):
+    fig = px.bar(
+        team_perf,
+        y='Team',
+        x='Total_Students',
+        orientation='h',
+        title='Team Student Volume',
+        text='Total_Students',
+        color='Completion_Rate_%',
+        color_continuous_scale='Viridis',
+        labels={'Total_Students': 'Number of Students', 'Completion_Rate_%': 'Completion %'}
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=500)
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False)
+def build_course_bar(course_analysis):
+    fig = px.bar(
+        course_analysis,
+        y='Course',
+        x='Total_Students',
+        orientation='h',
+        title='Course Popularity (Bar Length = Students, Color = Completion Rate)',
+        text='Total_Students',
+        color='Completion_Rate_%',
+        color_continuous_scale='RdYlGn',
+        labels={'Total_Students': 'Number of Students', 'Completion_Rate_%': 'Completion %'}
+    )
+    fig.update_traces(textposition='outside')
+    fig.update_layout(
+        yaxis={'categoryorder': 'total ascending'},
+        height=max(500, len(course_analysis) * 35),
+        plot_bgcolor='white',
+        margin=dict(l=150, r=50, t=80, b=50)
+    )
+    return fig.to_dict()
+
 def main():
     # Header
     st.markdown("""
@@ -396,6 +710,16 @@ def main():
                 else:
                     st.error(f"❌ Error: {error}")
         
+        uploaded_file = st.file_uploader(
+            "📂 Or upload a CSV export",
+            type="csv",
+            help="Use a CSV export of the sheet instead of the Apps Script API"
+        )
+        if uploaded_file is not None:
+            df = load_and_normalize(uploaded_file.getvalue())
+            st.session_state.data_df = df
+            st.success(f"✅ Loaded {len(df)} records from {uploaded_file.name}")
+
         if st.button("🔄 Refresh", use_container_width=True, disabled=st.session_state.data_df is None):
             st.rerun()
         
@@ -421,7 +745,12 @@ def main():
         
         # Filter Logic
         if 'Month' in df.columns:
-            months = sorted(df['Month'].unique().astype(str).tolist())
+            # Category metadata already holds the sorted unique values, so
+            # there is no full-column scan to build the selector options
+            if isinstance(df['Month'].dtype, pd.CategoricalDtype):
+                months = df['Month'].cat.categories.astype(str).tolist()
+            else:
+                months = sorted(df['Month'].dropna().unique().astype(str).tolist())
             
             with st.sidebar:
                 st.divider()
@@ -437,7 +766,13 @@ def main():
                 st.info(f"📅 Showing data for: **{selected_month}** ({len(df)} records)")
 
         kpis = calculate_kpis(df)
-        
+
+        # Compute the per-group tables once per rerun; the Excel handler
+        # and the tabs below all reuse them (cache makes repeats a lookup)
+        tutor_perf = create_tutor_performance(df)
+        team_perf = create_team_performance(df)
+        course_analysis = create_course_analysis(df)
+
         # KPI Dashboard
         st.markdown('<div class="section-header"><h2>🏆 Executive Dashboard</h2></div>', unsafe_allow_html=True)
         
@@ -459,7 +794,7 @@ def main():
         col1, col2 = st.columns(2)
         
         with col1:
-            csv = df.to_csv(index=False).encode('utf-8')
+            csv = create_csv_bytes(df)
             st.download_button(
                 "📄 Download CSV",
                 csv,
@@ -469,13 +804,11 @@ def main():
             )
         
         with col2:
+            include_raw = st.checkbox("Include raw data sheet", value=False,
+                                      help="Adds every record to the Excel report (slower for large sheets)")
             if st.button("💎 Generate Excel Report", use_container_width=True, type="primary"):
                 with st.spinner("Creating Excel report..."):
-                    tutor_perf = create_tutor_performance(df)
-                    team_perf = create_team_performance(df)
-                    course_analysis = create_course_analysis(df)
-                    
-                    excel_data = create_excel_report(df, kpis, tutor_perf, team_perf, course_analysis)
+                    excel_data = create_excel_report(df, kpis, tutor_perf, team_perf, course_analysis, include_raw)
                     
                     st.download_button(
                         "⬇️ Download Excel",
@@ -502,43 +835,41 @@ def main():
             
             with col1:
                 if 'Status_Clean' in df.columns:
-                    status_counts = df['Status_Clean'].value_counts().reset_index()
-                    status_counts.columns = ['Status', 'Count']
-                    
-                    fig = px.pie(status_counts, values='Count', names='Status', 
-                                title='Student Status Distribution', hole=0.3)
-                    st.plotly_chart(fig, use_container_width=True)
-            
+                    status_counts = value_count_frame(df['Status_Clean'], 'Status')
+                    st.plotly_chart(go.Figure(build_status_pie(status_counts)),
+                                    use_container_width=True)
+
             with col2:
                 if 'Completion_Status' in df.columns:
-                    comp_counts = df['Completion_Status'].value_counts().reset_index()
-                    comp_counts.columns = ['Status', 'Count']
-                    
-                    fig = px.bar(comp_counts, x='Status', y='Count',
-                               title='Completion Status', color='Count')
-                    st.plotly_chart(fig, use_container_width=True)
+                    comp_counts = value_count_frame(df['Completion_Status'], 'Status')
+                    st.plotly_chart(go.Figure(build_completion_bar(comp_counts)),
+                                    use_container_width=True)
             
-            st.dataframe(df, use_container_width=True, height=300)
+            # Only the visible page crosses the wire - serializing the full
+            # frame to the browser on every rerun is pure bandwidth waste
+            page_size = 50
+            n_pages = max(1, -(-len(df) // page_size))
+            page = st.number_input("Page", min_value=1, max_value=n_pages, value=1,
+                                   help=f"{len(df):,} records, {page_size} per page")
+            start = (page - 1) * page_size
+            st.dataframe(df.iloc[start:start + page_size],
+                         use_container_width=True, height=300)
         
         with tab2:
             st.markdown('<div class="section-header"><h3>👨‍🏫 Tutor Performance</h3></div>', unsafe_allow_html=True)
             
-            tutor_perf = create_tutor_performance(df)
-            
             if not tutor_perf.empty:
                 st.dataframe(tutor_perf, use_container_width=True, height=400)
                 
-                fig = px.bar(tutor_perf.head(10), x='Tutor', y='Total_Students',
-                           title='Top 10 Tutors by Student Count',
-                           color='Completion_Rate_%', color_continuous_scale='Greens')
-                fig.update_layout(xaxis_tickangle=-45)
-                st.plotly_chart(fig, use_container_width=True)
+                # nlargest is a partial selection rather than a full sort,
+                # and only these 10 rows get JSON-serialized for the chart
+                top10 = tutor_perf.nlargest(10, 'Total_Students')
+                st.plotly_chart(go.Figure(build_tutor_bar(top10)),
+                                use_container_width=True)
         
         with tab3:
             st.markdown('<div class="section-header"><h3>👥 Team Performance Targets</h3></div>', unsafe_allow_html=True)
             
-            team_perf = create_team_performance(df)
-            
             if not team_perf.empty:
                 # Champion Card
                 top_team = team_perf.iloc[0]
@@ -553,20 +884,8 @@ def main():
                 
                 with col1:
                     # Fancy Horizontal Bar Chart
-                    fig = px.bar(
-                        team_perf, 
-                        y='Team', 
-                        x='Total_Students',
-                        orientation='h',
-                        title='Team Student Volume',
-                        text='Total_Students',
-                        color='Completion_Rate_%', 
-                        color_continuous_scale='Viridis',
-                        labels={'Total_Students': 'Number of Students', 'Completion_Rate_%': 'Completion %'}
-                    )
-                    fig.update_traces(textposition='outside')
-                    fig.update_layout(yaxis={'categoryorder':'total ascending'}, height=500)
-                    st.plotly_chart(fig, use_container_width=True)
+                    st.plotly_chart(go.Figure(build_team_bar(team_perf)),
+                                    use_container_width=True)
                 
                 with col2:
                     st.markdown("### 📋 Detailed Metrics")
@@ -587,8 +906,6 @@ def main():
         with tab4:
             st.markdown('<div class="section-header"><h3>📚 Course Popularity & Analysis</h3></div>', unsafe_allow_html=True)
             
-            course_analysis = create_course_analysis(df)
-            
             if not course_analysis.empty:
                 # Champion Card
                 top_course = course_analysis.iloc[0]
@@ -601,25 +918,8 @@ def main():
                 ), unsafe_allow_html=True)
 
                 # Simple horizontal bar chart - Course Popularity
-                fig = px.bar(
-                    course_analysis,
-                    y='Course',
-                    x='Total_Students',
-                    orientation='h',
-                    title='Course Popularity (Bar Length = Students, Color = Completion Rate)',
-                    text='Total_Students',
-                    color='Completion_Rate_%',
-                    color_continuous_scale='RdYlGn',
-                    labels={'Total_Students': 'Number of Students', 'Completion_Rate_%': 'Completion %'}
-                )
-                fig.update_traces(textposition='outside')
-                fig.update_layout(
-                    yaxis={'categoryorder': 'total ascending'},
-                    height=max(500, len(course_analysis) * 35),
-                    plot_bgcolor='white',
-                    margin=dict(l=150, r=50, t=80, b=50)
-                )
-                st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(go.Figure(build_course_bar(course_analysis)),
+                                use_container_width=True)
                 
                 with st.expander("🔎 View Course Details Table"):
                     st.dataframe(course_analysis, use_container_width=True)